@@ -0,0 +1,9 @@
+"""Make src/python/equitrends_python.py importable from the test suite."""
+
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    "src", "python")
+)